@@ -1,20 +1,65 @@
-import json
+import asyncio
+import hashlib
+import io
 import os
-import time
+import re
+from collections import namedtuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from urllib.parse import urljoin
+import orjson
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import random
 
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:  # Optional: without it every listing is rendered in the browser
+    curl_requests = None
+
 # ----------------------------
 # Configuration
 # ----------------------------
 BASE_URL = "https://in.bookmyshow.com/explore/events-national-capital-region-ncr"
+# Listing pages to scrape; add more cities or paginated variants here
+LISTING_URLS = [BASE_URL]
+PAGE_POOL_SIZE = 3  # Pages open at the same time
+HTTP_IMPERSONATE = "chrome124"  # Browser TLS fingerprint used for plain HTTP fetches
+# The HTTP result of a listing is only used once a browser run has shown
+# it holds nearly everything the rendered page does, and it is checked
+# against the browser again every few runs
+HTTP_MIN_COVERAGE = 0.9  # Share of the last rendered event count HTTP must reach
+HTTP_RECHECK_RUNS = 7  # HTTP-only runs before the browser cross-checks again
+# Server-rendered state scripts that may already hold the listings
+EMBEDDED_STATE_PATTERN = re.compile(
+    r"<script[^>]*>\s*(?:window\.__\w+__\s*=\s*)?(\{.*?\})\s*;?\s*</script>",
+    re.DOTALL
+)
+# XHR endpoints the explore page loads its listings from. These and the
+# field names below are best guesses, not confirmed against the site, so
+# every capture logs where its events were found
+API_URL_MARKERS = ("/api/explore/", "/serv/getData")
+API_URL_KEYS = ("ctaUrl", "eventUrl", "url", "link")
+# Event detail pages, e.g. /events/rambo-circus/ET00332998; promo tiles and
+# category links under /events/ do not carry an event code
+EVENT_URL_PATTERN = re.compile(r"/events/[^/?#]+/ET\d+")
+API_FIELDS = {
+    "name": ("title", "name", "eventName"),
+    "venue": ("venueName", "venue", "location", "subtitle"),
+    "date": ("displayDate", "eventDate", "date"),
+    "price": ("displayPrice", "price", "minPrice"),
+    "image": ("image", "imageUrl", "imageSrc"),
+    "status": ("status", "tag", "label")
+}
 DATA_DIR = Path("data/bookmyshow")
 REPORTS_DIR = Path("reports")
+REPORT_CACHE_DIR = REPORTS_DIR / ".cache"
+BROWSER_PROFILE_DIR = Path("data/browser-profile")
+RENDERING_STATE_FILE = DATA_DIR / "rendering.json"  # Per listing: last rendered count, HTTP runs since
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 TIME_THRESHOLD = datetime.now() - timedelta(hours=24)
 MAX_RETRIES = 3
 WAIT_TIMEOUT = 60000  # Increased to 60 seconds
@@ -23,11 +68,70 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
 ]
+# Card fields and the selectors that locate them within a card
+CARD_FIELD_SELECTORS = {
+    "name": "h2, h3, h4, div[class*='title'], div[class*='name'], span[class*='title']",
+    "venue": "div[class*='venue'], div[class*='location'], span[class*='venue'], span[class*='location']",
+    "date": "div[class*='date'], div[class*='time'], span[class*='date'], span[class*='time']",
+    "price": "div[class*='price'], span[class*='amount'], div[class*='cost'], span[class*='price']",
+    "image": "img",
+    "status": "div[class*='status'], div[class*='tag'], span[class*='ribbon'], div[class*='label']"
+}
+# Runs inside the page: returns the href and fields of every card matching
+# the selector. Each card is walked once with the union of all field
+# selectors; every field takes the first element (in document order) that
+# matches its own selector, same as a per-field querySelector would.
+# Cards without a name are skipped, and duplicate hrefs are dropped before
+# anything is sent back to Python.
+CARD_EXTRACTION_JS = """
+([selector, fields]) => {
+    const entries = Object.entries(fields);
+    const combined = entries.map(([, sel]) => sel).join(", ");
+    const cards = [];
+    const seen = new Set();
+    for (const card of document.querySelectorAll(selector)) {
+        const found = {};
+        for (const element of card.querySelectorAll(combined)) {
+            for (const [key, sel] of entries) {
+                if (!(key in found) && element.matches(sel)) found[key] = element;
+            }
+        }
+        if (!found.name) continue;
+        const href = card.getAttribute("href") || null;
+        if (seen.has(href)) continue;
+        seen.add(href);
+        const event = {href};
+        for (const [key, element] of Object.entries(found)) {
+            event[key] = key === "image"
+                ? (element.getAttribute("src") || element.getAttribute("data-src") || "N/A")
+                : element.textContent.trim();
+        }
+        cards.push(event);
+    }
+    return cards;
+}
+"""
+EVENT_LINK_SELECTOR = "a[href*='/events/']"  # Appears once cards render, grows as more load
+SELECTOR_GRACE_PERIOD = 1  # Seconds higher-ranked card selectors get after the first match
+BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
 IGNORE_FIELDS = {'timestamp', 'scraped_at'}
 STATUS_INDICATORS = {
     'fast_filling': ['fast filling', 'filling fast', 'almost full', 'limited seats'],
     'sold_out': ['sold out', 'housefull', 'no seats']
 }
+# Stored with each event but never compared: the CDN image URLs encode the
+# card's date overlay, so they change daily while the event does not
+DIFF_IGNORE_FIELDS = {'image'}
+# Fields that make two snapshots of the same event differ
+EventKey = namedtuple("EventKey", [
+    field for field in ("name", "venue", "date", "price", "image", "status")
+    if field not in DIFF_IGNORE_FIELDS
+])
+# All indicators in one alternation, one named group per status
+STATUS_PATTERN = re.compile("|".join(
+    f"(?P<{status}>{'|'.join(map(re.escape, indicators))})"
+    for status, indicators in STATUS_INDICATORS.items()
+))
 
 # ----------------------------
 # Helper Functions
@@ -45,75 +149,264 @@ def get_yesterday_date() -> str:
 
 def get_filename(date: str) -> Path:
     """Returns the filename for storing events data"""
+    return DATA_DIR / f"events_{date}.ndjson"
+
+def get_legacy_filename(date: str) -> Path:
+    """Returns the JSON array file events were stored in before NDJSON"""
     return DATA_DIR / f"events_{date}.json"
 
+def get_index_filename(events_file: Path) -> Path:
+    """Returns the url index filename stored next to an events file"""
+    return Path(events_file).with_suffix(".idx")
+
 def get_report_filename(date: str) -> Path:
     """Returns the filename for storing report"""
     return REPORTS_DIR / f"event_report_{date}.txt"
 
-def is_recent_event(event_date_str: str) -> bool:
-    """Check if event was added within our time threshold"""
-    try:
-        event_date = datetime.strptime(event_date_str, "%Y-%m-%d %H:%M:%S")
-        return event_date >= TIME_THRESHOLD
-    except (ValueError, TypeError):
-        return False
+def get_scrape_timestamps() -> Tuple[str, str]:
+    """Returns the timestamp and scraped_at values shared by one batch of events"""
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d %H:%M:%S"), now.isoformat()
 
 def check_event_status(text: str) -> Dict[str, bool]:
     """Check if event is fast filling or sold out based on text"""
-    text = text.lower()
+    hits = {match.lastgroup for match in STATUS_PATTERN.finditer(text.lower())}
     return {
-        'is_fast_filling': any(indicator in text for indicator in STATUS_INDICATORS['fast_filling']),
-        'is_sold_out': any(indicator in text for indicator in STATUS_INDICATORS['sold_out'])
+        'is_fast_filling': 'fast_filling' in hits,
+        'is_sold_out': 'sold_out' in hits
     }
 
 # ----------------------------
 # Scraping Functions
 # ----------------------------
-def scrape_events() -> Optional[List[Dict[str, Any]]]:
-    """Scrape events from BookMyShow website"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-blink-features=AutomationControlled',
-                '--user-agent=' + get_random_user_agent()
-            ],
-            slow_mo=200  # Increased delay between actions
-        )
+def is_events_response(response) -> bool:
+    """Check if a network response is one of the site's events API payloads"""
+    if response.status != 200:
+        return False
+    if "json" not in response.headers.get("content-type", ""):
+        return False
+    return any(marker in response.url for marker in API_URL_MARKERS)
+
+def first_string(item: Dict[str, Any], keys) -> Optional[str]:
+    """Return the first non-empty string value found under any of the keys"""
+    for key in keys:
+        value = item.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+def is_api_event(item: Any) -> bool:
+    """Check if a payload entry is an event: it links to an event page and has a name"""
+    if not isinstance(item, dict):
+        return False
+    url = first_string(item, API_URL_KEYS)
+    return bool(url and EVENT_URL_PATTERN.search(url) and first_string(item, API_FIELDS["name"]))
+
+def find_listing(payload: Any, path: Tuple = ()) -> Tuple[Tuple, List[Dict[str, Any]]]:
+    """Return the key path and events of the longest array of events in the payload.
+
+    Carousels and recommendation blocks are shorter arrays of the same kind
+    of entries, so only the main listing is kept.
+    """
+    best_path, best = path, []
+    if isinstance(payload, dict):
+        children = payload.items()
+    elif isinstance(payload, list):
+        items = [value for value in payload if is_api_event(value)]
+        if items:
+            return path, items
+        children = enumerate(payload)
+    else:
+        return best_path, best
+
+    for key, value in children:
+        found_path, found = find_listing(value, path + (key,))
+        if len(found) > len(best):
+            best_path, best = found_path, found
+    return best_path, best
+
+def extract_api_events(payloads: List[Tuple[str, Any]], base_url: str) -> List[Dict[str, Any]]:
+    """Map the listing in each captured (source, payload) pair into event records"""
+    events = []
+    seen_urls = set()
+    timestamp, scraped_at = get_scrape_timestamps()
+
+    for source, payload in payloads:
+        path, items = find_listing(payload)
+        if not items:
+            continue
+        print(f"Found {len(items)} listed events in {source} at {'/'.join(map(str, path)) or 'top level'}")
+
+        for item in items:
+            url = " " + urljoin(base_url, first_string(item, API_URL_KEYS))
+
+            # Skip duplicates
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+
+            event_data = {
+                "name": first_string(item, API_FIELDS["name"]),
+                "url": url,
+                "timestamp": timestamp,
+                "scraped_at": scraped_at
+            }
+
+            for key in ("venue", "date", "price", "image", "status"):
+                value = first_string(item, API_FIELDS[key])
+                if value is None:
+                    continue
+                event_data[key] = value
 
-        context = browser.new_context(
-            user_agent=get_random_user_agent(),
-            viewport={"width": 1280, "height": 720},
-            locale="en-IN",
-            timezone_id="Asia/Kolkata",
-            java_script_enabled=True,
-            has_touch=False,
-            is_mobile=False
-        )
+                # Check for fast filling or sold out status
+                if key == "status":
+                    event_data.update(check_event_status(value))
 
-        # Block unnecessary resources
-        context.route("**/*.{png,jpg,jpeg,webp,gif,svg}", lambda route: route.abort())
-        context.route("**/*.css", lambda route: route.abort())
-        context.route("**/*.woff2", lambda route: route.abort())
+            events.append(event_data)
+
+    return events
 
-        page = context.new_page()
+def fetch_listing_http(url: str) -> List[Dict[str, Any]]:
+    """Fetch a listing page over plain HTTP and read events from its embedded state"""
+    if curl_requests is None:
+        return []
+    try:
+        response = curl_requests.get(
+            url,
+            impersonate=HTTP_IMPERSONATE,
+            headers={"Accept-Language": "en-IN,en;q=0.9"},
+            timeout=WAIT_TIMEOUT / 1000
+        )
+        if response.status_code != 200:
+            return []
+
+        payloads = []
+        for match in EMBEDDED_STATE_PATTERN.finditer(response.text):
+            try:
+                payloads.append(("embedded state", orjson.loads(match.group(1))))
+            except orjson.JSONDecodeError:
+                continue
+        return extract_api_events(payloads, url)
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return []
+
+async def extract_dom_events(page) -> List[Dict[str, Any]]:
+    """Extract events from the rendered event cards"""
+    # Try multiple selector patterns with more variations
+    event_selectors = [
+        "div[class*='card']",
+        "div[class*='event']",
+        "a[href*='/events/']",
+        "div[class*='slide']",
+        "div[data-qa='event-card']",
+        "div[class*='style__EventCardWrapper']",
+        "div[class*='event-card']",
+        "div[class*='card-container']",
+        "div[class*='event-container']"
+    ]
+
+    events = []
+
+    # Wait on every selector at once and stop at the first match; selectors
+    # ranked ahead of it only get a short grace period to match as well, and
+    # the waits still pending are then cancelled.
+    probes = [
+        asyncio.ensure_future(page.wait_for_selector(s, timeout=15000))
+        for s in event_selectors
+    ]
+
+    def matched(probe) -> bool:
+        return probe.done() and not probe.cancelled() and probe.exception() is None
+
+    try:
+        pending = set(probes)
+        while pending and not any(map(matched, probes)):
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+        first_hit = next((i for i, probe in enumerate(probes) if matched(probe)), len(probes))
+        ahead = [probe for probe in probes[:first_hit] if not probe.done()]
+        if ahead:
+            await asyncio.wait(ahead, timeout=SELECTOR_GRACE_PERIOD)
+
+        for i, (selector, probe) in enumerate(zip(event_selectors, probes)):
+            if i < first_hit and not probe.done():
+                continue  # Did not match within the grace period
+            try:
+                await probe
+            except PlaywrightTimeoutError:
+                continue
+            except Exception as e:
+                print(f"Error waiting for selector {selector}: {e}")
+                continue
+
+            # Read every card in a single round-trip to the browser
+            cards = await page.evaluate(CARD_EXTRACTION_JS, [selector, CARD_FIELD_SELECTORS])
+            print(f"Found {len(cards)} cards with selector: {selector}")
+            timestamp, scraped_at = get_scrape_timestamps()
+
+            for card in cards:
+                url = " " + card["href"] if card.get("href") else "N/A"
+
+                event_data = {
+                    "name": card["name"],
+                    "url": url,
+                    "timestamp": timestamp,
+                    "scraped_at": scraped_at
+                }
+
+                for key in ("venue", "date", "price", "image", "status"):
+                    if key not in card:
+                        continue
+                    event_data[key] = card[key]
+
+                    # Check for fast filling or sold out status
+                    if key == "status":
+                        event_data.update(check_event_status(card[key]))
+
+                events.append(event_data)
+
+            if events:
+                print(f"Successfully collected {len(events)} events with selector: {selector}")
+                break
+    finally:
+        for probe in probes:
+            probe.cancel()
+        # Collect the cancelled waits so none is left unretrieved
+        await asyncio.gather(*probes, return_exceptions=True)
+
+    return events
+
+async def scrape_listing(context, url: str, page_slots: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    """Scrape the events of a single listing page"""
+    async with page_slots:
+        page = await context.new_page()
+
+        # Capture the listing JSON the page fetches for itself
+        api_responses = []
+
+        def on_response(response):
+            if is_events_response(response):
+                api_responses.append((response.url, asyncio.ensure_future(response.json())))
+
+        page.on("response", on_response)
 
         try:
             page.set_default_timeout(WAIT_TIMEOUT)
-            print("Loading BookMyShow with realistic behavior...")
-            page.goto(BASE_URL, wait_until="networkidle")
-
-            # Human-like interactions
-            for _ in range(5):  # Increased interactions
-                page.mouse.move(
-                    random.randint(0, 500),
-                    random.randint(0, 500)
-                )
-                time.sleep(random.uniform(0.5, 2.0))  # Increased delay
+            print(f"Loading {url}...")
+            await page.goto(url, wait_until="domcontentloaded")
+
+            # Stop waiting as soon as the first event card is rendered
+            try:
+                await page.wait_for_selector(EVENT_LINK_SELECTOR, timeout=10000)
+            except PlaywrightTimeoutError:
+                pass
+
+            # A single human-like interaction
+            await page.mouse.move(
+                random.randint(0, 500),
+                random.randint(0, 500)
+            )
 
             # Dismiss popups
             for selector in [
@@ -123,219 +416,459 @@ def scrape_events() -> Optional[List[Dict[str, Any]]]:
                 "#onetrust-accept-btn-handler"
             ]:
                 try:
-                    page.click(selector, timeout=5000)  # Increased timeout
-                    time.sleep(1.5)  # Increased delay
+                    await page.click(selector, timeout=5000)  # Increased timeout
+                    await asyncio.sleep(1.5)  # Increased delay
                     break
                 except:
                     pass
 
-            # Scroll to load content with more attempts and longer delays
+            # Scroll until the page stops rendering more event links
             print("Scrolling to load events...")
-            scroll_attempts = 8  # Increased from 5 to 8
-            scroll_delay_min = 1.5  # Increased minimum delay
-            scroll_delay_max = 3.5  # Increased maximum delay
+            scroll_attempts = 8  # Upper bound; stops early once nothing new loads
             
             for i in range(scroll_attempts):
+                loaded = await page.evaluate(
+                    "(sel) => document.querySelectorAll(sel).length", EVENT_LINK_SELECTOR
+                )
                 # Scroll a bit further down each time
                 scroll_distance = f"window.innerHeight * {0.8 + (i * 0.1)}"
-                page.evaluate(f"window.scrollBy(0, {scroll_distance})")
+                await page.evaluate(f"window.scrollBy(0, {scroll_distance})")
                 print(f"Scroll attempt {i+1}/{scroll_attempts}")
-                time.sleep(random.uniform(scroll_delay_min, scroll_delay_max))
                 
-                # Check for loading indicators
                 try:
-                    loading_selector = "div[class*='loading'], div[class*='spinner']"
-                    page.wait_for_selector(loading_selector, state="hidden", timeout=5000)
-                except:
-                    pass
+                    await page.wait_for_function(
+                        "([sel, loaded]) => document.querySelectorAll(sel).length > loaded",
+                        arg=[EVENT_LINK_SELECTOR, loaded],
+                        timeout=5000
+                    )
+                except PlaywrightTimeoutError:
+                    break
 
-            # Wait for content to settle after scrolling
-            time.sleep(3)
-
-            # Try multiple selector patterns with more variations
-            event_selectors = [
-                "div[class*='card']",
-                "div[class*='event']",
-                "a[href*='/events/']",
-                "div[class*='slide']",
-                "div[data-qa='event-card']",
-                "div[class*='style__EventCardWrapper']",
-                "div[class*='event-card']",
-                "div[class*='card-container']",
-                "div[class*='event-container']"
-            ]
-
-            events = []
-            seen_urls = set()
-            
-            for selector in event_selectors:
-                try:
-                    page.wait_for_selector(selector, timeout=15000)  # Increased timeout
-                    cards = page.query_selector_all(selector)
-                    print(f"Found {len(cards)} cards with selector: {selector}")
-
-                    for card in cards:
-                        try:
-                            name = card.query_selector("h2, h3, h4, div[class*='title'], div[class*='name'], span[class*='title']")
-                            if not name:
-                                continue
-
-                            url = " " + card.get_attribute("href") if card.get_attribute("href") else "N/A"
-                            
-                            # Skip duplicates
-                            if url in seen_urls:
-                                continue
-                            seen_urls.add(url)
-
-                            event_data = {
-                                "name": name.text_content().strip(),
-                                "url": url,
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                "scraped_at": datetime.now().isoformat()
-                            }
-
-                            # Extract additional details with more selectors
-                            details = {
-                                "venue": "div[class*='venue'], div[class*='location'], span[class*='venue'], span[class*='location']",
-                                "date": "div[class*='date'], div[class*='time'], span[class*='date'], span[class*='time']",
-                                "price": "div[class*='price'], span[class*='amount'], div[class*='cost'], span[class*='price']",
-                                "image": "img",
-                                "status": "div[class*='status'], div[class*='tag'], span[class*='ribbon'], div[class*='label']"
-                            }
-                            
-                            for key, sel in details.items():
-                                try:
-                                    element = card.query_selector(sel)
-                                    if element:
-                                        if key == "image":
-                                            event_data[key] = element.get_attribute("src") or element.get_attribute("data-src") or "N/A"
-                                        else:
-                                            text_content = element.text_content().strip()
-                                            event_data[key] = text_content
-                                            
-                                            # Check for fast filling or sold out status
-                                            if key == "status":
-                                                status_info = check_event_status(text_content)
-                                                event_data.update(status_info)
-                                except:
-                                    pass
-
-                            events.append(event_data)
-                        except Exception as e:
-                            print(f"Error processing card: {e}")
-                            continue
-
-                    if events:
-                        print(f"Successfully collected {len(events)} events with selector: {selector}")
-                        break
+            # Let any in-flight listing requests finish
+            try:
+                await page.wait_for_load_state("networkidle", timeout=3000)
+            except PlaywrightTimeoutError:
+                pass
+
+            payloads = await asyncio.gather(*(body for _, body in api_responses), return_exceptions=True)
+            events = extract_api_events([
+                (source, pl) for (source, _), pl in zip(api_responses, payloads)
+                if not isinstance(pl, Exception)
+            ], url)
+
+            if events:
+                print(f"Collected {len(events)} events from {len(payloads)} API responses")
+            else:
+                print("No events API payload captured, falling back to event cards...")
+                events = await extract_dom_events(page)
+
+            return events
+        finally:
+            await page.close()
+
+async def scrape_with_browser(urls: List[str]) -> List[Any]:
+    """Scrape listing pages with Playwright, returning events or the error per url"""
+    async with async_playwright() as p:
+        # Reuse one on-disk profile so cookies, cache and TLS state survive between runs
+        context = await p.chromium.launch_persistent_context(
+            str(BROWSER_PROFILE_DIR),
+            headless=True,
+            args=[
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-blink-features=AutomationControlled',
+                '--blink-settings=imagesEnabled=false',
+                '--user-agent=' + get_random_user_agent()
+            ],
+            user_agent=get_random_user_agent(),
+            viewport={"width": 1280, "height": 720},
+            locale="en-IN",
+            timezone_id="Asia/Kolkata",
+            java_script_enabled=True,
+            has_touch=False,
+            is_mobile=False
+        )
 
-                except PlaywrightTimeoutError:
-                    continue
+        # Block unnecessary resources
+        await context.route(
+            "**/*",
+            lambda route: route.abort()
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+            else route.continue_()
+        )
+
+        try:
+            # Scrape all listing pages concurrently, at most PAGE_POOL_SIZE at a time
+            page_slots = asyncio.Semaphore(PAGE_POOL_SIZE)
+            return await asyncio.gather(
+                *(scrape_listing(context, url, page_slots) for url in urls),
+                return_exceptions=True
+            )
+        finally:
+            await context.close()
+
+def load_rendering_state() -> Dict[str, Dict[str, int]]:
+    """Returns {url: {'rendered': event count, 'http_runs': n}} from earlier runs"""
+    try:
+        with open(RENDERING_STATE_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
 
-            # Filter recent events
-            recent_events = [e for e in events if is_recent_event(e['timestamp'])]
-            print(f"Found {len(recent_events)} recent events")
-            return recent_events
+def trust_http_result(state: Dict[str, Dict[str, int]], url: str, events: List[Dict[str, Any]]) -> bool:
+    """Check if a listing's HTTP result can stand in for rendering it"""
+    if not events:
+        return False
+    entry = state.get(url)
+    if entry is None or entry['http_runs'] >= HTTP_RECHECK_RUNS:
+        print(f"Cross-checking {len(events)} HTTP events from {url} in the browser")
+        return False
+    if len(events) < HTTP_MIN_COVERAGE * entry['rendered']:
+        print(f"Warning: HTTP returned {len(events)} events from {url}, "
+              f"last rendered run had {entry['rendered']}; rendering instead")
+        return False
+    entry['http_runs'] += 1
+    return True
 
-        except Exception as e:
-            print(f"Error during scraping: {str(e)}")
+async def scrape_events() -> Optional[List[Dict[str, Any]]]:
+    """Scrape events from BookMyShow website"""
+    try:
+        # Try plain HTTP first; only listings that need rendering go to the browser
+        state = load_rendering_state()
+        results = {}
+        http_results = await asyncio.gather(
+            *(asyncio.to_thread(fetch_listing_http, url) for url in LISTING_URLS)
+        )
+        for url, events in zip(LISTING_URLS, http_results):
+            if trust_http_result(state, url, events):
+                print(f"Collected {len(events)} events from {url} without a browser")
+                results[url] = events
+
+        browser_urls = [url for url in LISTING_URLS if url not in results]
+        if browser_urls:
+            results.update(zip(browser_urls, await scrape_with_browser(browser_urls)))
+
+        # Rendered runs become the baseline the HTTP results are held to
+        for url, http_events in zip(LISTING_URLS, http_results):
+            result = results[url]
+            if url not in browser_urls or isinstance(result, Exception) or not result:
+                continue
+            entry = state[url] = {'rendered': len(result), 'http_runs': 0}
+            if http_events and len(http_events) < HTTP_MIN_COVERAGE * entry['rendered']:
+                # Never trusted until a later cross-check sees it complete
+                entry['http_runs'] = HTTP_RECHECK_RUNS
+        try:
+            write_atomic(RENDERING_STATE_FILE, orjson.dumps(state))
+        except OSError as e:
+            print(f"Error saving rendering state: {e}")
+
+        events = []
+        seen_urls = set()
+        for url in LISTING_URLS:
+            result = results[url]
+            if isinstance(result, Exception):
+                print(f"Error during scraping {url}: {str(result)}")
+                continue
+            for event in result:
+                # Skip events listed on more than one page
+                if event['url'] in seen_urls:
+                    continue
+                seen_urls.add(event['url'])
+                events.append(event)
+
+        if all(isinstance(result, Exception) for result in results.values()):
             return None
-        finally:
-            browser.close()
+
+        # Every event was stamped during this run, so recency is one check for all
+        recent_events = events if datetime.now() >= TIME_THRESHOLD else []
+        print(f"Found {len(recent_events)} recent events")
+        return recent_events
+
+    except Exception as e:
+        print(f"Error during scraping: {str(e)}")
+        return None
+
+def write_atomic(filename: Path, data: bytes) -> None:
+    """Write data to a temp file and rename it over the target, so a crash
+    never leaves a truncated file behind for the next compare"""
+    tmp_filename = filename.with_suffix(filename.suffix + ".tmp")
+    with open(tmp_filename, "wb", buffering=0) as f:
+        f.write(data)
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
 
 def save_events(events: List[Dict], date: str) -> None:
-    """Save events to JSON file"""
+    """Save events to NDJSON file, one event per line, plus its url index"""
     if not events:
         return
         
     filename = get_filename(date)
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(events, f, indent=2, ensure_ascii=False)
+        lines = [orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE) for event in events]
+        index = {}
+        offset = 0
+        for event, line in zip(events, lines):
+            index[event['url']] = [event_digest(event), offset]
+            offset += len(line)
+
+        write_atomic(filename, b"".join(lines))
+        # The digests depend on the compared fields, so the index records them
+        write_atomic(get_index_filename(filename), orjson.dumps({
+            "fields": EventKey._fields,
+            "events": index
+        }))
         print(f"Saved {len(events)} events to {filename}")
     except Exception as e:
         print(f"Error saving events: {e}")
 
+def convert_legacy_events(date: str) -> None:
+    """Convert a day's legacy JSON array snapshot to NDJSON, if it has no NDJSON yet"""
+    legacy_file = get_legacy_filename(date)
+    if get_filename(date).exists() or not legacy_file.exists():
+        return
+    try:
+        with open(legacy_file, 'rb') as f:
+            events = orjson.loads(f.read())
+    except orjson.JSONDecodeError:
+        print(f"Error: Could not decode {legacy_file}")
+        return
+    print(f"Converting {legacy_file} to NDJSON...")
+    save_events(events, date)
+
 # ----------------------------
 # Comparison Functions
 # ----------------------------
-def load_events(filename: str) -> Dict[str, Dict[str, Any]]:
-    """Load events from JSON file and return as dict with url as keys."""
+@dataclass
+class ComparisonResults:
+    """Differences between two days of events"""
+    added: Iterator[Dict[str, Any]]
+    removed: Iterator[Dict[str, Any]]
+    modified: Iterator[Dict[str, Any]]
+    stats: Dict[str, int]
+    key: str  # Digest of the differences, used to cache the report
+
+def event_key(event: Dict[str, Any]) -> EventKey:
+    """Return the event's comparable fields as an EventKey."""
+    return EventKey(*(event.get(field) for field in EventKey._fields))
+
+def event_digest(event: Dict[str, Any]) -> str:
+    """Hash the event's comparable fields; equal events get equal digests."""
+    return hashlib.blake2b(orjson.dumps(list(event_key(event))), digest_size=8).hexdigest()
+
+def load_index(filename: str) -> Optional[Dict[str, List[Any]]]:
+    """Return the .idx written by save_events for an events file, or None.
+
+    None covers a missing, stale, differently digested or unreadable index;
+    the index is only a cache, so the caller just rebuilds it.
+    """
+    index_file = get_index_filename(filename)
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            events = json.load(f)
-        return {event['url']: event for event in events}
+        if index_file.stat().st_mtime < Path(filename).stat().st_mtime:
+            return None
+        with open(index_file, 'rb') as f:
+            stored = orjson.loads(f.read())
+        if stored.get("fields") != list(EventKey._fields):
+            return None
+        index = stored["events"]
+        if all(isinstance(entry, list) and len(entry) == 2 for entry in index.values()):
+            return index
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError, AttributeError, KeyError, TypeError):
+        pass
+    print(f"Warning: Ignoring unreadable index {index_file}")
+    return None
+
+def index_events(filename: str) -> Dict[str, List[Any]]:
+    """Return {url: [digest, line offset]} for an NDJSON events file.
+
+    Uses the stored .idx when it is valid, otherwise streams the events
+    file to rebuild it.
+    """
+    index = load_index(filename)
+    if index is not None:
+        return index
+
+    try:
+        index = {}
+        with open(filename, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    event = orjson.loads(line)
+                    index[event['url']] = [event_digest(event), offset]
+                offset += len(line)
+        return index
     except FileNotFoundError:
         return {}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Could not decode {filename}")
         return {}
 
-def compare_events(old_file: str, new_file: str) -> Dict[str, Any]:
-    """Compare events between two JSON files and return differences."""
-    # Load events from both files
-    old_events = load_events(old_file)
-    new_events = load_events(new_file)
+def read_event(f, offset: int) -> Dict[str, Any]:
+    """Read the event stored on the line starting at offset."""
+    f.seek(offset)
+    return orjson.loads(f.readline())
+
+def diff_fields(old_key: EventKey, new_key: EventKey) -> Dict[str, Tuple[Any, Any]]:
+    """Return {field: (old, new)} for every comparable field that changed."""
+    return {
+        field: (old_value, new_value)
+        for field, old_value, new_value in zip(EventKey._fields, old_key, new_key)
+        if old_value != new_value
+    }
+
+def iter_events(filename: str, index: Dict[str, List[Any]], urls: List[str]) -> Iterator[Dict[str, Any]]:
+    """Lazily read the events for the given urls, one at a time."""
+    with open(filename, 'rb') as f:
+        for url in urls:
+            yield read_event(f, index[url][1])
+
+def iter_modified(old_file: str, old_index: Dict[str, List[Any]], new_file: str,
+                  new_index: Dict[str, List[Any]], urls: List[str]) -> Iterator[Dict[str, Any]]:
+    """Lazily yield {'event', 'changes'} for every modified url."""
+    with open(old_file, 'rb') as old_f, open(new_file, 'rb') as new_f:
+        for url in urls:
+            old_event = read_event(old_f, old_index[url][1])
+            new_event = read_event(new_f, new_index[url][1])
+            yield {
+                'event': new_event,
+                'changes': diff_fields(event_key(old_event), event_key(new_event))
+            }
+
+def compare_events(old_file: str, new_file: str) -> ComparisonResults:
+    """Compare events between two NDJSON files and return differences.
+
+    The added/removed/modified events are generators that read each record
+    from disk only when it is consumed, so they can be iterated just once.
+    """
+    # Index both files by url without loading the events themselves
+    old_index = index_events(old_file)
+    new_index = index_events(new_file)
     
     # Get all event URLs
-    old_urls = set(old_events.keys())
-    new_urls = set(new_events.keys())
+    old_urls = set(old_index.keys())
+    new_urls = set(new_index.keys())
     
-    # Find added, removed, and modified events
-    added_urls = new_urls - old_urls
-    removed_urls = old_urls - new_urls
+    # Find added, removed, and modified events, sorted so identical
+    # comparisons produce identical results
+    added_urls = sorted(new_urls - old_urls)
+    removed_urls = sorted(old_urls - new_urls)
+    modified_urls = sorted(url for url in old_urls & new_urls if old_index[url][0] != new_index[url][0])
     
-    return {
-        'added': [new_events[url] for url in added_urls],
-        'removed': [old_events[url] for url in removed_urls],
-        'stats': {
-            'added': len(added_urls),
-            'removed': len(removed_urls),
-            'total_old': len(old_events),
-            'total_new': len(new_events)
-        }
+    stats = {
+        'added': len(added_urls),
+        'removed': len(removed_urls),
+        'modified': len(modified_urls),
+        'total_old': len(old_index),
+        'total_new': len(new_index)
     }
-
-def generate_report_content(results: Dict[str, Any]) -> str:
-    """Generate the report content as a string."""
-    stats = results['stats']
-    report_lines = []
     
-    report_lines.append("\n=== Event Comparison Results ===")
-    report_lines.append(f"Old file: {stats['total_old']} events")
-    report_lines.append(f"New file: {stats['total_new']} events")
-    report_lines.append(f"Comparison time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    # The digests cover every field shown in the report, so they identify
+    # the report content without reading the events
+    key = hashlib.blake2b(orjson.dumps([
+        stats,
+        [[url, new_index[url][0]] for url in added_urls],
+        [[url, old_index[url][0]] for url in removed_urls],
+        [[url, old_index[url][0], new_index[url][0]] for url in modified_urls]
+    ]), digest_size=16).hexdigest()
     
-    report_lines.append(f"Newly added events ({stats['added']}):")
-    for event in results['added']:
-        report_lines.append(f"- {event.get('name', 'Untitled Event')}")
-        report_lines.append(f"  URL: {event.get('url', 'N/A')}")
+    return ComparisonResults(
+        added=iter_events(new_file, new_index, added_urls),
+        removed=iter_events(old_file, old_index, removed_urls),
+        modified=iter_modified(old_file, old_index, new_file, new_index, modified_urls),
+        stats=stats,
+        key=key
+    )
+
+def get_report_cache_filename(results: ComparisonResults, date: str) -> Path:
+    """Returns the cache file for a report body, keyed by date and comparison digest"""
+    return REPORT_CACHE_DIR / f"{date}-{results.key}.txt"
+
+def prune_report_cache(date: str) -> None:
+    """Remove cached report bodies from other days; they can never be hit again"""
+    for cache_file in REPORT_CACHE_DIR.glob("*.txt"):
+        if not cache_file.name.startswith(f"{date}-"):
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                print(f"Error pruning report cache: {e}")
+
+def generate_report_content(results: ComparisonResults, date: str) -> str:
+    """Generate the report content, reusing today's cached body for identical results.
+
+    Only the body is cached; the header with the comparison time is
+    written fresh on every run.
+    """
+    cache_file = get_report_cache_filename(results, date)
+    if cache_file.exists():
+        report_body = cache_file.read_text(encoding="utf-8")
+    else:
+        report_body = build_report_body(results)
+        prune_report_cache(date)
+        try:
+            cache_file.write_text(report_body, encoding="utf-8")
+        except OSError as e:
+            print(f"Error caching report: {e}")
+    return build_report_header(results.stats) + report_body
+
+def build_report_header(stats: Dict[str, int]) -> str:
+    """Generate the report header, stamped with the current time."""
+    # Every line after the first starts with its own newline separator
+    return (
+        "\n=== Event Comparison Results ==="
+        f"\nOld file: {stats['total_old']} events"
+        f"\nNew file: {stats['total_new']} events"
+        f"\nComparison time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    )
+
+def build_report_body(results: ComparisonResults) -> str:
+    """Generate the added/removed/modified sections and the summary as a string."""
+    stats = results.stats
+    summary = []  # The first few added events, repeated in the summary section
+    buf = io.StringIO()
+    w = buf.write
+    
+    w(f"\nNewly added events ({stats['added']}):")
+    for event in results.added:
+        if len(summary) < 10:
+            summary.append(event)
+        w(f"\n- {event.get('name', 'Untitled Event')}\n  URL: {event.get('url', 'N/A')}")
         if event.get('is_fast_filling', False):
-            report_lines.append("  (Fast Filling!)")
+            w("\n  (Fast Filling!)")
         if event.get('is_sold_out', False):
-            report_lines.append("  (SOLD OUT!)")
+            w("\n  (SOLD OUT!)")
+    
+    w(f"\n\nRemoved events ({stats['removed']}):")
+    for event in results.removed:
+        w(f"\n- {event.get('name', 'Untitled Event')}\n  URL: {event.get('url', 'N/A')}")
     
-    report_lines.append(f"\nRemoved events ({stats['removed']}):")
-    for event in results['removed']:
-        report_lines.append(f"- {event.get('name', 'Untitled Event')}")
-        report_lines.append(f"  URL: {event.get('url', 'N/A')}")
+    w(f"\n\nModified events ({stats['modified']}):")
+    for change in results.modified:
+        event = change['event']
+        w(f"\n- {event.get('name', 'Untitled Event')}\n  URL: {event.get('url', 'N/A')}")
+        for field, (old_value, new_value) in change['changes'].items():
+            w(f"\n  {field}: {old_value or 'N/A'} -> {new_value or 'N/A'}")
     
     # Add summary of new events
-    if results['added']:
-        report_lines.append("\n=== New Events Summary ===")
-        for i, event in enumerate(results['added'][:10], 1):
-            report_lines.append(f"\n{i}. {event.get('name', 'Untitled Event')}")
-            report_lines.append(f"   Venue: {event.get('venue', 'N/A')}")
-            report_lines.append(f"   Date: {event.get('date', 'N/A')}")
-            report_lines.append(f"   URL: {event.get('url', 'N/A')}")
+    if summary:
+        w("\n\n=== New Events Summary ===")
+        for i, event in enumerate(summary, 1):
+            w(
+                f"\n\n{i}. {event.get('name', 'Untitled Event')}"
+                f"\n   Venue: {event.get('venue', 'N/A')}"
+                f"\n   Date: {event.get('date', 'N/A')}"
+                f"\n   URL: {event.get('url', 'N/A')}"
+            )
             if event.get('price'):
-                report_lines.append(f"   Price: {event.get('price')}")
+                w(f"\n   Price: {event.get('price')}")
             if event.get('is_fast_filling', False):
-                report_lines.append("   Status: FAST FILLING!")
+                w("\n   Status: FAST FILLING!")
             if event.get('is_sold_out', False):
-                report_lines.append("   Status: SOLD OUT!")
+                w("\n   Status: SOLD OUT!")
     
-    return "\n".join(report_lines)
+    return buf.getvalue()
 
 def save_report(report_content: str, date: str) -> None:
     """Save the report to a text file."""
@@ -347,9 +880,9 @@ def save_report(report_content: str, date: str) -> None:
     except Exception as e:
         print(f"Error saving report: {e}")
 
-def print_and_save_report(results: Dict[str, Any], date: str) -> None:
+def print_and_save_report(results: ComparisonResults, date: str) -> None:
     """Print the report to console and save to file."""
-    report_content = generate_report_content(results)
+    report_content = generate_report_content(results, date)
     
     # Print to console
     print(report_content)
@@ -360,13 +893,13 @@ def print_and_save_report(results: Dict[str, Any], date: str) -> None:
 # ----------------------------
 # Main Execution
 # ----------------------------
-def main():
+async def main():
     # Step 1: Scrape today's events
     current_date = get_current_date()
     yesterday_date = get_yesterday_date()
     
     print(f"Scraping BookMyShow NCR events (recent since {TIME_THRESHOLD})...")
-    recent_events = scrape_events()
+    recent_events = await scrape_events()
     
     if not recent_events:
         print("No recent events found or scraping failed.")
@@ -378,6 +911,7 @@ def main():
     # Step 3: Compare with yesterday's events
     today_file = get_filename(current_date)
     yesterday_file = get_filename(yesterday_date)
+    convert_legacy_events(yesterday_date)
     
     if not yesterday_file.exists():
         print("\nNo previous day's file found for comparison.")
@@ -388,4 +922,4 @@ def main():
     print_and_save_report(comparison_results, current_date)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -1,108 +1,222 @@
-from openpyxl import Workbook
-from datetime import datetime
+import mmap
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from contextlib import nullcontext
+from xml.sax.saxutils import escape
+
+# One alternative per kind of report line; the named group that matched
+# tells the parser what the line is and holds its value. The lookahead
+# rejects lines whose first character no alternative can start with
+# before any of them is tried. Values after a label are captured greedily
+# to the end of the line and trimmed once by the parser. The pattern is
+# bytes so it runs on the raw mapped file; only values that end up in a
+# row are decoded.
+REPORT_LINE_PATTERN = re.compile(
+    rb"^(?=[-= \dNRM])(?:"
+    rb"===[ \t]*(?P<banner>.+?)[ \t]*==="
+    rb"|(?P<heading>Newly added events|Removed events|Modified events) \(\d+\):"
+    rb"|- (?P<item>.+)"
+    rb"|  URL:[ \t]*(?P<url>.*)"
+    rb"|\d+\.[ \t]+(?P<summary_name>.+)"
+    rb"|   Venue:[ \t]*(?P<summary_venue>.*)"
+    rb"|   Date:[ \t]*(?P<summary_date>.*)"
+    rb"|   URL:[ \t]*(?P<summary_url>.*)"
+    rb")[ \t\r]*$",
+    re.MULTILINE
+)
+# Shared by every row instead of a fresh string per event
+NA = sys.intern('N/A')
+ADDED = sys.intern('Added')
+REMOVED = sys.intern('Removed')
+SUMMARY = sys.intern('New Summary')
+EMPTY = ''
+# Events are rows in HEADERS order: [name, type, venue, date, url]
+TYPE_COL, VENUE_COL, DATE_COL, URL_COL = 1, 2, 3, 4
+# Columns whose values repeat across rows go through the shared strings
+# table; names and URLs are nearly always unique and stay inline
+SHARED_COLS = frozenset((TYPE_COL, VENUE_COL, DATE_COL))
+
+# Dispatch tables, keyed by the name of the group that matched
+SECTIONS = {  # banner/heading text -> section it opens
+    b'Newly added events': 'added',
+    b'Removed events': 'removed',
+    b'Modified events': 'modified',
+    b'New Events Summary': 'summary'
+}
+EVENT_STARTS = {  # line kind -> {section: type of the event the line starts}
+    'item': {'added': ADDED, 'removed': REMOVED},
+    'summary_name': {'summary': SUMMARY}
+}
+EVENT_FIELDS = {  # line kind -> (sections it applies in, column it fills)
+    'url': (('added', 'removed'), URL_COL),
+    'summary_venue': (('summary',), VENUE_COL),
+    'summary_date': (('summary',), DATE_COL),
+    'summary_url': (('summary',), URL_COL)
+}
+
+HEADERS = ('Event Name', 'Type', 'Venue', 'Date', 'URL')
+SHEET_NAME = "Event Report"
+COLUMN_LETTERS = 'ABCDE'  # one per entry in HEADERS
+
+# The workbook is written as a bare ZIP of the minimal OPC parts; only
+# the sheet is generated, everything else is fixed
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{SHEET_NAME}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>'
+        '</Relationships>'
+    )
+}
+SHEET_PART = 'xl/worksheets/sheet1.xml'
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+SHEET_TAIL = '</sheetData></worksheet>'
+STRINGS_PART = 'xl/sharedStrings.xml'
+STRINGS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{}" uniqueCount="{}">'
+)
+STRINGS_TAIL = '</sst>'
+# Level 1 deflate is most of the speed for little size difference
+ZIP_OPTIONS = {'compression': zipfile.ZIP_DEFLATED, 'compresslevel': 1}
+# Control characters XML 1.0 forbids; Excel reads them back from _xHHHH_
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def cell_text(value):
+    """Return the <t> element holding a cell string, as inline and shared strings store it"""
+    text = INVALID_XML_CHARS.sub(lambda m: f"_x{ord(m.group()):04X}_", escape(value))
+    if value != value.strip():  # Keep leading/trailing whitespace
+        return f'<t xml:space="preserve">{text}</t>'
+    return f'<t>{text}</t>'
+
+def map_report(file):
+    """Map the report read-only; mmap refuses empty files, so those get an empty buffer"""
+    if os.fstat(file.fileno()).st_size == 0:
+        return nullcontext(b'')
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
 
 def convert_report_to_excel(input_file, output_file):
-    # Create a new workbook and select the active worksheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Event Report"
+    # Rows are spooled here because the column widths go before them
+    sheet_data = tempfile.TemporaryFile()
+
+    # Shared cells refer to each distinct value by its index in the table,
+    # so repeated types, venues and dates are stored once
+    shared = {}
+    sst = []
+    refs = 0
+
+    max_len = [0] * len(HEADERS)
+    row = 0
 
-    # Read the input file
-    with open(input_file, 'r', encoding='utf-8') as file:
-        content = file.read()
+    def write_event(event):
+        """Write one event row, tracking the widest value per column as we go"""
+        nonlocal row, refs
+        row += 1
+        cells = []
+        for i, v in enumerate(event):
+            if len(v) > max_len[i]:
+                max_len[i] = len(v)
+            if not v:  # Leave empty values as blank cells
+                continue
+            if i in SHARED_COLS:
+                idx = shared.get(v)
+                if idx is None:
+                    idx = shared[v] = len(sst)
+                    sst.append(v)
+                refs += 1
+                cells.append(f'<c r="{COLUMN_LETTERS[i]}{row}" t="s"><v>{idx}</v></c>')
+            else:
+                cells.append(f'<c r="{COLUMN_LETTERS[i]}{row}" t="inlineStr"><is>{cell_text(v)}</is></c>')
+        sheet_data.write(f'<row r="{row}">{"".join(cells)}</row>'.encode('utf-8'))
+
+    # Write headers
+    write_event(HEADERS)
 
     # Initialize variables
     current_section = None
-    events = []
-    current_event = {}
-
-    # Parse the content
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Detect section changes
-        if line.startswith('==='):
-            if 'Newly added events' in line:
-                current_section = 'added'
-            elif 'Removed events' in line:
-                current_section = 'removed'
-            elif 'New Events Summary' in line:
-                current_section = 'summary'
-            continue
-            
-        # Process events in added/removed sections
-        if line.startswith('- ') and current_section in ['added', 'removed']:
-            if current_event:  # Save previous event if exists
-                events.append(current_event)
-            event_name = line[2:]
-            current_event = {
-                'name': event_name,
-                'url': '',
-                'type': 'Added' if current_section == 'added' else 'Removed',
-                'venue': 'N/A',
-                'date': 'N/A'
-            }
-        elif line.startswith('  URL:') and current_event:
-            current_event['url'] = line.replace('URL:', '').strip()
-            
-        # Process events in summary section
-        elif current_section == 'summary' and line[0].isdigit() and '. ' in line:
-            if current_event:  # Save previous event if exists
-                events.append(current_event)
-            event_name = line.split('. ', 1)[1]
-            current_event = {
-                'name': event_name,
-                'url': '',
-                'type': 'New Summary',
-                'venue': 'N/A',
-                'date': 'N/A'
-            }
-        elif current_section == 'summary' and line.startswith('   Venue:'):
-            current_event['venue'] = line.replace('Venue:', '').strip()
-        elif current_section == 'summary' and line.startswith('   Date:'):
-            current_event['date'] = line.replace('Date:', '').strip()
-        elif current_section == 'summary' and line.startswith('   URL:'):
-            current_event['url'] = line.replace('URL:', '').strip()
-
-    # Add the last event if exists
-    if current_event:
-        events.append(current_event)
+    current_event = None  # [name, type, venue, date, url]
 
-    # Write headers
-    headers = ['Event Name', 'Type', 'Venue', 'Date', 'URL']
-    ws.append(headers)
-
-    # Write event data
-    for event in events:
-        row = [
-            event['name'],
-            event['type'],
-            event['venue'],
-            event['date'],
-            event['url']
-        ]
-        ws.append(row)
+    # Sweep the raw mapped bytes with a single regex; each event is
+    # written out as soon as the next one starts
+    with open(input_file, 'rb') as file, map_report(file) as mm:
+        for match in REPORT_LINE_PATTERN.finditer(mm):
+            kind = match.lastgroup
+            value = match.group(kind).rstrip()
+
+            field = EVENT_FIELDS.get(kind)
+            if field is not None:
+                sections, column = field
+                if current_event and current_section in sections:
+                    current_event[column] = value.decode('utf-8')
+            elif kind in EVENT_STARTS:
+                event_type = EVENT_STARTS[kind].get(current_section)
+                if event_type:
+                    if current_event:  # Write previous event if exists
+                        write_event(current_event)
+                    current_event = [value.decode('utf-8'), event_type, NA, NA, EMPTY]
+            else:
+                # Detect section changes
+                current_section = SECTIONS.get(value, current_section)
+
+    # Write the last event if exists
+    if current_event:
+        write_event(current_event)
 
     # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2) * 1.2
-        ws.column_dimensions[column_letter].width = adjusted_width
+    cols = ''.join(
+        f'<col min="{i}" max="{i}" width="{(m + 2) * 1.2:g}" customWidth="1"/>'
+        for i, m in enumerate(max_len, start=1)
+    )
 
     # Save the workbook
-    wb.save(output_file)
+    with sheet_data, zipfile.ZipFile(output_file, 'w', **ZIP_OPTIONS) as zf:
+        for name, xml in XLSX_STATIC_PARTS.items():
+            zf.writestr(name, xml)
+        with zf.open(SHEET_PART, 'w') as sheet:
+            sheet.write(f'{SHEET_HEAD}<cols>{cols}</cols><sheetData>'.encode('utf-8'))
+            sheet_data.seek(0)
+            shutil.copyfileobj(sheet_data, sheet)
+            sheet.write(SHEET_TAIL.encode('utf-8'))
+        with zf.open(STRINGS_PART, 'w') as strings:
+            strings.write(STRINGS_HEAD.format(refs, len(sst)).encode('utf-8'))
+            for v in sst:
+                strings.write(f'<si>{cell_text(v)}</si>'.encode('utf-8'))
+            strings.write(STRINGS_TAIL.encode('utf-8'))
     print(f"Excel file saved as {output_file}")
 
-# Example usage
-input_file = 'event_report_2025-06-05.txt'
-output_file = 'event_report_2025-06-05.xlsx'
-convert_report_to_excel(input_file, output_file)
\ No newline at end of file
+if __name__ == "__main__":
+    # Example usage
+    input_file = 'event_report_2025-06-05.txt'
+    output_file = 'event_report_2025-06-05.xlsx'
+    convert_report_to_excel(input_file, output_file)
\ No newline at end of file